@@ -7,8 +7,13 @@ import os
 class BiodiversityAnalyzer:
     def __init__(self, file_path):
         print("Loading cleaned dataset...")
-        self.df = pd.read_csv(file_path)
+        self.df = pd.read_parquet(file_path)
         print(f"Dataset loaded. Shape: {self.df.shape}")
+
+        # Non-missing mask, shared by the completeness analysis and summary
+        self._notna_mask = self.df.notna().to_numpy()
+        self._col_completeness = pd.Series(self._notna_mask.mean(axis=0) * 100,
+                                           index=self.df.columns)
         
         # Create directory for plots
         self.plot_dir = 'cleaned_data_plots'
@@ -36,7 +41,7 @@ class BiodiversityAnalyzer:
         # Create taxonomic distribution plot
         plt.figure(figsize=(12, 6))
         taxonomic_levels = ['phylum', 'class', 'order', 'family', 'genus']
-        counts = [self.df[level].nunique() for level in taxonomic_levels]
+        counts = self.df[taxonomic_levels].nunique().tolist()
         
         plt.bar(taxonomic_levels, counts, color=self.colors)
         plt.title('Taxonomic Diversity', pad=20)
@@ -72,11 +77,8 @@ class BiodiversityAnalyzer:
                 'NE': '#BDBDBD'   # Light Grey
             }
             
-            bars = plt.bar(iucn_counts.index, iucn_counts.values)
-            
-            # Color the bars
-            for i, bar in enumerate(bars):
-                bar.set_color(iucn_colors.get(iucn_counts.index[i], '#2196F3'))
+            bar_colors = [iucn_colors.get(cat, '#2196F3') for cat in iucn_counts.index]
+            plt.bar(iucn_counts.index, iucn_counts.values, color=bar_colors)
             
             plt.title('Distribution of IUCN Red List Categories', pad=20)
             plt.xlabel('IUCN Category')
@@ -95,11 +97,14 @@ class BiodiversityAnalyzer:
         print("-" * 50)
         
         if 'eventDate' in self.df.columns:
-            # Convert to datetime if needed
-            self.df['eventDate'] = pd.to_datetime(self.df['eventDate'])
-            
             plt.figure(figsize=(12, 6))
-            yearly_counts = self.df['eventDate'].dt.year.value_counts().sort_index()
+            # Count records per year with a counting pass, skipping empty years
+            years = self.df['eventDate'].dt.year.to_numpy(dtype=np.float64)
+            years = years[~np.isnan(years)].astype(np.int32)
+            first_year = years.min()
+            counts = np.bincount(years - first_year)
+            yearly_counts = pd.Series(counts, index=np.arange(first_year, first_year + len(counts)))
+            yearly_counts = yearly_counts[yearly_counts > 0]
             plt.plot(yearly_counts.index, yearly_counts.values, marker='o')
             plt.title('Temporal Distribution of Records', pad=20)
             plt.xlabel('Year')
@@ -139,7 +144,7 @@ class BiodiversityAnalyzer:
         print("-" * 50)
         
         # Calculate completeness for each column
-        completeness = (self.df.count() / len(self.df) * 100).round(2)
+        completeness = self._col_completeness.round(2)
         
         plt.figure(figsize=(12, 6))
         top_20_completeness = completeness.sort_values().tail(20)
@@ -159,13 +164,14 @@ class BiodiversityAnalyzer:
         print("\n6. SUMMARY REPORT")
         print("-" * 50)
         
+        unique_counts = self.df[['species', 'genus', 'family', 'stateProvince']].nunique()
         summary = {
             "Total Records": len(self.df),
-            "Unique Species": self.df['species'].nunique(),
-            "Unique Genera": self.df['genus'].nunique(),
-            "Unique Families": self.df['family'].nunique(),
-            "Geographic Coverage": self.df['stateProvince'].nunique(),
-            "Data Completeness": f"{self.df.notna().mean().mean()*100:.2f}%"
+            "Unique Species": unique_counts['species'],
+            "Unique Genera": unique_counts['genus'],
+            "Unique Families": unique_counts['family'],
+            "Geographic Coverage": unique_counts['stateProvince'],
+            "Data Completeness": f"{self._notna_mask.mean()*100:.2f}%"
         }
         
         print("\nDataset Summary:")
@@ -183,7 +189,7 @@ class BiodiversityAnalyzer:
 
 if __name__ == "__main__":
     try:
-        analyzer = BiodiversityAnalyzer('cleaned_dataset.csv')
+        analyzer = BiodiversityAnalyzer('cleaned_dataset.parquet')
         analyzer.run_analysis()
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -2,36 +2,57 @@ import pandas as pd
 import numpy as np
 from sklearn.impute import KNNImputer
 from scipy import stats
+from occurrence_loader import load_occurrences
 
 class DataCleaner:
     def __init__(self, file_path):
         print("Loading dataset...")
-        self.df = pd.read_csv(file_path, delimiter='\t', low_memory=False)
-        self.original_df = self.df.copy()
+        self.df = load_occurrences(file_path)
+        self._original_missing = self.df.isnull().sum()
+        self._original_dtypes = self.df.dtypes.copy()
+
+        # Store heavily repeated text columns as categories
+        categorical_columns = ['phylum', 'class', 'order', 'family', 'genus', 'species',
+                               'stateProvince', 'iucnRedListCategory', 'countryCode',
+                               'taxonRank', 'taxonomicStatus']
+        for col in categorical_columns:
+            if col in self.df.columns:
+                self.df[col] = self.df[col].astype('category')
+
+        self._refresh_schema()
         print(f"Dataset loaded. Shape: {self.df.shape}")
 
+    def _refresh_schema(self):
+        """Cache numeric and categorical column names for the cleaning steps"""
+        self._numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        self._object_cols = self.df.select_dtypes(include=['object', 'category']).columns
+
     def impute_missing_values(self):
         """Impute missing values using appropriate methods for different column types"""
         print("\n1. IMPUTING MISSING VALUES")
         print("-" * 50)
 
         # Separate numeric and categorical columns
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        categorical_cols = self.df.select_dtypes(include=['object']).columns
-
-        # Impute numeric columns with mean
-        for col in numeric_cols:
-            if self.df[col].isnull().any():
-                mean_value = self.df[col].mean()
-                self.df[col].fillna(mean_value, inplace=True)
-                print(f"Imputed {col} with mean value: {mean_value:.2f}")
-
-        # Impute categorical columns with mode
-        for col in categorical_cols:
-            if self.df[col].isnull().any():
-                mode_value = self.df[col].mode()[0]
-                self.df[col].fillna(mode_value, inplace=True)
-                print(f"Imputed {col} with mode value: {mode_value}")
+        numeric_cols = self._numeric_cols
+        categorical_cols = self._object_cols
+        has_missing = self.df.isnull().any()
+
+        # Numeric columns get their mean, categorical columns their mode
+        means = self.df[numeric_cols[has_missing[numeric_cols]]].mean()
+        modes = {}
+        for col in categorical_cols[has_missing[categorical_cols]]:
+            mode = self.df[col].mode(dropna=True)
+            if not mode.empty:
+                modes[col] = mode.iloc[0]
+
+        # Fill all columns in a single pass
+        self.df = self.df.fillna({**means.to_dict(), **modes})
+
+        # Report all imputed columns in one table
+        imputed_log = ([(col, 'mean', round(value, 2)) for col, value in means.items()] +
+                       [(col, 'mode', value) for col, value in modes.items()])
+        if imputed_log:
+            print(pd.DataFrame(imputed_log, columns=['column', 'strategy', 'value']).to_string(index=False))
 
     def knn_imputation(self):
         """Perform KNN imputation on numeric columns"""
@@ -40,29 +61,42 @@ class DataCleaner:
 
         try:
             # Get numeric columns
-            numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+            numeric_cols = self._numeric_cols
             
             if len(numeric_cols) > 0:
-                # Create a subset of numeric data
-                numeric_data = self.df[numeric_cols].copy()
-                
-                # Check for infinite values and replace with NaN
-                numeric_data = numeric_data.replace([np.inf, -np.inf], np.nan)
-                
+                # Take a single float copy of the numeric data
+                values = self.df[numeric_cols].to_numpy(dtype=np.float64)
+
+                # Treat infinite values as missing, in place
+                values[np.isinf(values)] = np.nan
+                missing = np.isnan(values)
+
                 # Remove columns with all NaN values
-                numeric_data = numeric_data.dropna(axis=1, how='all')
-                
-                if numeric_data.shape[1] > 0:  # If we still have columns after cleaning
-                    # Initialize KNN imputer
-                    imputer = KNNImputer(n_neighbors=min(5, len(numeric_data)-1))
-                    
-                    # Perform imputation
-                    imputed_data = imputer.fit_transform(numeric_data)
-                    
+                keep = ~missing.all(axis=0)
+                numeric_data = pd.DataFrame(values[:, keep], columns=numeric_cols[keep],
+                                            index=self.df.index)
+
+                if numeric_data.shape[1] > 0 and not missing[:, keep].any():
+                    print("No missing numeric values left, skipping KNN imputation")
+                elif numeric_data.shape[1] > 0:  # If we still have columns after cleaning
+                    # Fit on a subsample, pairwise distances are quadratic in rows
+                    sample = numeric_data.sample(min(10_000, len(numeric_data)), random_state=0)
+                    # A sparse column can miss the sample entirely, add a few rows where it was observed
+                    for col in sample.columns[sample.isna().all().to_numpy()]:
+                        observed = numeric_data.index[numeric_data[col].notna().to_numpy()][:5]
+                        sample = pd.concat([sample, numeric_data.loc[observed.difference(sample.index)]])
+                    imputer = KNNImputer(n_neighbors=min(5, len(sample)-1))
+                    imputer.fit(sample)
+
+                    # Transform in batches to bound the distance matrix size
+                    imputed_data = np.empty(numeric_data.shape)
+                    for start in range(0, len(numeric_data), 50_000):
+                        batch = numeric_data.iloc[start:start + 50_000]
+                        imputed_data[start:start + 50_000] = imputer.transform(batch)
+
                     # Update dataframe with imputed values
-                    for i, col in enumerate(numeric_data.columns):
-                        self.df[col] = imputed_data[:, i]
-                    
+                    self.df[numeric_data.columns] = imputed_data
+
                     print(f"KNN imputation completed for {len(numeric_data.columns)} numeric columns")
                 else:
                     print("No suitable numeric columns for KNN imputation after cleaning")
@@ -78,57 +112,97 @@ class DataCleaner:
         print("\n3. OUTLIER HANDLING")
         print("-" * 50)
 
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        
-        for col in numeric_cols:
-            try:
-                # Calculate IQR
-                Q1 = self.df[col].quantile(0.25)
-                Q3 = self.df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                
-                # Define bounds
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                # Count outliers
-                outliers = self.df[(self.df[col] < lower_bound) | (self.df[col] > upper_bound)][col]
-                if len(outliers) > 0:
-                    print(f"\nOutliers in {col}:")
-                    print(f"Number of outliers: {len(outliers)}")
-                    print(f"Bounds: [{lower_bound:.2f}, {upper_bound:.2f}]")
-                    
-                    # Replace outliers with bounds
-                    self.df.loc[self.df[col] < lower_bound, col] = lower_bound
-                    self.df.loc[self.df[col] > upper_bound, col] = upper_bound
-                    print(f"Outliers capped at bounds")
-            except Exception as e:
-                print(f"Error processing outliers for {col}: {str(e)}")
+        numeric_cols = self._numeric_cols
+
+        try:
+            # Take the numeric data once, skipping empty columns
+            values = self.df[numeric_cols].to_numpy(dtype=np.float64)
+            has_values = ~np.isnan(values).all(axis=0)
+            numeric_cols = numeric_cols[has_values]
+            values = values[:, has_values]
+            if len(numeric_cols) == 0:
+                return
+
+            # Calculate IQR for all columns in one pass
+            Q1, Q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+            IQR = Q3 - Q1
+
+            # Define bounds
+            lower_bounds = Q1 - 1.5 * IQR
+            upper_bounds = Q3 + 1.5 * IQR
+
+            # Find outliers once, the same masks count and cap them
+            below = values < lower_bounds
+            above = values > upper_bounds
+            outlier_counts = below.sum(axis=0) + above.sum(axis=0)
+            np.copyto(values, lower_bounds, where=below)
+            np.copyto(values, upper_bounds, where=above)
+
+            # Only write back columns that actually had outliers
+            capped = outlier_counts > 0
+            self.df[numeric_cols[capped]] = values[:, capped]
+
+            # Report all capped columns in one table
+            if capped.any():
+                outlier_log = pd.DataFrame({
+                    'column': numeric_cols[capped],
+                    'outliers': outlier_counts[capped],
+                    'lower_bound': lower_bounds[capped].round(2),
+                    'upper_bound': upper_bounds[capped].round(2)
+                })
+                print("\nOutliers capped at bounds:")
+                print(outlier_log.to_string(index=False))
+        except Exception as e:
+            print(f"Error processing outliers: {str(e)}")
 
     def convert_data_types(self):
         """Convert data types to appropriate formats"""
         print("\n4. DATA TYPE CONVERSION")
         print("-" * 50)
 
+        conversion_log = []
+
         # Convert date columns
         date_columns = [col for col in self.df.columns if 'date' in col.lower()]
         for col in date_columns:
             try:
-                self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
-                print(f"Converted {col} to datetime")
+                self.df[col] = pd.to_datetime(self.df[col], format='ISO8601', errors='coerce',
+                                              utc=True, cache=True)
+                conversion_log.append(f"Converted {col} to datetime")
             except Exception as e:
-                print(f"Could not convert {col}: {str(e)}")
-
-        # Convert numeric strings to numbers
-        for col in self.df.columns:
-            if self.df[col].dtype == 'object':
-                try:
-                    numeric_conversion = pd.to_numeric(self.df[col], errors='coerce')
-                    if numeric_conversion.notnull().any():
-                        self.df[col] = numeric_conversion
-                        print(f"Converted {col} to numeric")
-                except:
-                    pass
+                conversion_log.append(f"Could not convert {col}: {str(e)}")
+
+        # Let pandas settle the columns it can already type on its own
+        self.df = self.df.infer_objects()
+
+        # Convert numeric strings to numbers, keeping mostly-text columns as they are
+        for col in self.df.select_dtypes(include=['object']).columns:
+            try:
+                numeric_conversion = pd.to_numeric(self.df[col], errors='coerce')
+                if numeric_conversion.notnull().mean() > 0.9:
+                    self.df[col] = numeric_conversion
+                    conversion_log.append(f"Converted {col} to numeric")
+            except:
+                pass
+
+        # Downcast floats whose magnitude float32 still represents well
+        float_cols = self.df.select_dtypes(include=['float64']).columns
+        float_cols = float_cols[self.df[float_cols].abs().max() < 1e6]
+        if len(float_cols) > 0:
+            self.df[float_cols] = self.df[float_cols].astype(np.float32)
+            conversion_log.append(f"Downcast {len(float_cols)} float columns to float32")
+
+        # Shrink integer columns to the smallest type that fits
+        int_cols = self.df.select_dtypes(include=['int64']).columns
+        for col in int_cols:
+            self.df[col] = pd.to_numeric(self.df[col], downcast='integer')
+        if len(int_cols) > 0:
+            conversion_log.append(f"Downcast {len(int_cols)} integer columns")
+
+        if conversion_log:
+            print("\n".join(conversion_log))
+
+        self._refresh_schema()
 
     def generate_cleaning_report(self):
         """Generate report comparing original and cleaned dataset"""
@@ -136,7 +210,7 @@ class DataCleaner:
         print("-" * 50)
 
         # Compare missing values
-        original_missing = self.original_df.isnull().sum()
+        original_missing = self._original_missing
         cleaned_missing = self.df.isnull().sum()
         
         print("\nMissing Values Comparison:")
@@ -149,7 +223,7 @@ class DataCleaner:
 
         # Compare data types
         print("\nData Type Changes:")
-        original_types = self.original_df.dtypes
+        original_types = self._original_dtypes
         cleaned_types = self.df.dtypes
         changed_types = original_types[original_types != cleaned_types]
         for col in changed_types.index:
@@ -157,7 +231,7 @@ class DataCleaner:
 
     def save_cleaned_data(self, output_path):
         """Save the cleaned dataset"""
-        self.df.to_csv(output_path, index=False)
+        self.df.to_parquet(output_path, compression='snappy', index=False)
         print(f"\nCleaned dataset saved to: {output_path}")
 
     def clean_data(self):
@@ -167,7 +241,7 @@ class DataCleaner:
         self.handle_outliers()
         self.convert_data_types()
         self.generate_cleaning_report()
-        self.save_cleaned_data('cleaned_dataset.csv')
+        self.save_cleaned_data('cleaned_dataset.parquet')
 
 if __name__ == "__main__":
     try:
@@ -2,11 +2,15 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import re
+from occurrence_loader import load_occurrences
 
 class ComprehensiveDataAnalyzer:
     def __init__(self, file_path):
         print("Loading dataset...")
-        self.df = pd.read_csv(file_path, delimiter='\t', low_memory=False)
+        self.df = load_occurrences(file_path)
+        self._numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        self._object_cols = self.df.select_dtypes(include=['object']).columns
+        self._na_counts = self.df.isna().sum()
         print(f"Dataset loaded. Shape: {self.df.shape}")
 
     def analyze_missing_data(self):
@@ -14,7 +18,7 @@ class ComprehensiveDataAnalyzer:
         print("\n1. MISSING DATA ANALYSIS")
         print("-" * 50)
         
-        missing = self.df.isnull().sum()
+        missing = self._na_counts
         missing_percent = (missing / len(self.df) * 100).round(2)
         missing_stats = pd.DataFrame({
             'Missing Values': missing,
@@ -43,27 +47,33 @@ class ComprehensiveDataAnalyzer:
         print("\n3. INCONSISTENT DATA ANALYSIS")
         print("-" * 50)
         
-        for column in self.df.columns:
-            if self.df[column].dtype == 'object':
-                unique_values = self.df[column].nunique()
-                if unique_values < 10:  # Only show if small number of unique values
-                    print(f"\nUnique values in {column}:")
-                    print(self.df[column].value_counts().head())
+        unique_values = self.df[self._object_cols].nunique()
+        # Only show if small number of unique values
+        for column in unique_values[unique_values < 10].index:
+            print(f"\nUnique values in {column}:")
+            print(self.df[column].value_counts().head())
 
     def analyze_outliers(self):
         """4. Outliers Analysis"""
         print("\n4. OUTLIERS ANALYSIS")
         print("-" * 50)
         
-        numeric_columns = self.df.select_dtypes(include=[np.number]).columns
-        for column in numeric_columns:
-            Q1 = self.df[column].quantile(0.25)
-            Q3 = self.df[column].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = self.df[(self.df[column] < (Q1 - 1.5 * IQR)) | 
-                             (self.df[column] > (Q3 + 1.5 * IQR))]
-            if len(outliers) > 0:
-                print(f"\nOutliers in {column}: {len(outliers)} records")
+        # Skip empty columns, their quantiles are undefined
+        has_values = self._na_counts[self._numeric_cols] < len(self.df)
+        columns = self._numeric_cols[has_values.to_numpy()]
+        if len(columns) == 0:
+            return
+        values = self.df[columns].to_numpy(dtype=np.float64)
+
+        # Quartiles and outlier counts for all columns at once
+        Q1, Q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+        IQR = Q3 - Q1
+        outlier_counts = ((values < (Q1 - 1.5 * IQR)) |
+                          (values > (Q3 + 1.5 * IQR))).sum(axis=0)
+
+        for column, count in zip(columns, outlier_counts):
+            if count > 0:
+                print(f"\nOutliers in {column}: {count} records")
                 print(f"Range: {self.df[column].min()} to {self.df[column].max()}")
 
     def analyze_data_types(self):
@@ -75,11 +85,11 @@ class ComprehensiveDataAnalyzer:
         print(self.df.dtypes)
         
         # Check for mixed data types
-        for column in self.df.columns:
-            if self.df[column].dtype == 'object':
-                numeric_values = pd.to_numeric(self.df[column], errors='coerce').notna().sum()
-                if 0 < numeric_values < len(self.df[column]):
-                    print(f"\nMixed data types in {column}: {numeric_values} numeric values")
+        numeric_counts = {column: pd.to_numeric(self.df[column], errors='coerce').notna().sum()
+                          for column in self._object_cols}
+        for column, numeric_values in numeric_counts.items():
+            if 0 < numeric_values < len(self.df):
+                print(f"\nMixed data types in {column}: {numeric_values} numeric values")
 
     def analyze_format_errors(self):
         """6. Format Error Analysis"""
@@ -100,18 +110,16 @@ class ComprehensiveDataAnalyzer:
         print("-" * 50)
         
         # Check for invalid coordinates if present
-        if 'decimalLatitude' in self.df.columns:
-            invalid_lat = self.df[
-                (self.df['decimalLatitude'] < -90) | 
-                (self.df['decimalLatitude'] > 90)
-            ].shape[0]
+        if ('decimalLatitude' in self.df.columns and
+                pd.api.types.is_numeric_dtype(self.df['decimalLatitude'])):
+            lat = self.df['decimalLatitude'].to_numpy()
+            invalid_lat = int(np.count_nonzero((lat < -90) | (lat > 90)))
             print(f"\nInvalid latitude values: {invalid_lat}")
-        
-        if 'decimalLongitude' in self.df.columns:
-            invalid_lon = self.df[
-                (self.df['decimalLongitude'] < -180) | 
-                (self.df['decimalLongitude'] > 180)
-            ].shape[0]
+
+        if ('decimalLongitude' in self.df.columns and
+                pd.api.types.is_numeric_dtype(self.df['decimalLongitude'])):
+            lon = self.df['decimalLongitude'].to_numpy()
+            invalid_lon = int(np.count_nonzero((lon < -180) | (lon > 180)))
             print(f"Invalid longitude values: {invalid_lon}")
 
     def analyze_structural_issues(self):
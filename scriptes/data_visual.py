@@ -2,11 +2,12 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
+from occurrence_loader import load_occurrences
 
 class DataVisualizer:
     def __init__(self, file_path):
         print("Loading dataset...")
-        self.df = pd.read_csv(file_path, delimiter='\t', low_memory=False)
+        self.df = load_occurrences(file_path)
         print(f"Dataset loaded. Shape: {self.df.shape}")
 
     def create_visualizations(self):
@@ -41,16 +42,24 @@ class DataVisualizer:
         plt.style.use('default')
         
         # Create missing data matrix
-        missing_data = self.df.isnull()
-        
+        missing_data = self.df.isnull().to_numpy()
+
+        # Downsample rows into bins, the plot is only a few hundred pixels tall
+        target_rows = 2000
+        if missing_data.shape[0] > target_rows:
+            bins = np.array_split(missing_data, target_rows, axis=0)
+            missing_data = np.stack([b.mean(axis=0) for b in bins])
+        else:
+            missing_data = missing_data.astype(np.float32)
+
         # Plot heatmap
-        plt.imshow(missing_data, cmap='Blues', aspect='auto')
+        plt.imshow(missing_data, cmap='Blues', aspect='auto', interpolation='nearest')
         plt.title('Missing Values Heatmap')
         plt.xlabel('Columns')
         plt.ylabel('Rows')
-        
+
         # Add colorbar
-        plt.colorbar(label='Missing (True/False)')
+        plt.colorbar(label='Fraction missing')
         
         # Adjust layout and save
         plt.tight_layout()
@@ -71,7 +80,12 @@ class DataVisualizer:
             else:
                 ax = axes
                 
-            ax.hist(self.df[col].dropna(), bins=30, edgecolor='black')
+            # Bin the values up front so the axes only keep the counts
+            data = self.df[col].to_numpy(dtype=np.float64)
+            data = data[~np.isnan(data)]
+            counts, edges = np.histogram(data, bins=30)
+            del data
+            ax.bar(edges[:-1], counts, width=np.diff(edges), edgecolor='black', align='edge')
             ax.set_title(f'Distribution of {col}')
             ax.set_xlabel(col)
             ax.set_ylabel('Frequency')
@@ -124,13 +138,10 @@ class DataVisualizer:
             # Create color map
             colors = ['lightgray', 'green', 'yellow', 'orange', 'red']
             
-            # Create bar plot
-            bars = plt.bar(iucn_counts.index, iucn_counts.values)
-            
-            # Color the bars
-            for i, bar in enumerate(bars):
-                if i < len(colors):
-                    bar.set_color(colors[i])
+            # Create bar plot, bars past the color map keep the default color
+            bar_colors = [colors[i] if i < len(colors) else 'C0'
+                          for i in range(len(iucn_counts))]
+            plt.bar(iucn_counts.index, iucn_counts.values, color=bar_colors)
             
             plt.title('Distribution of IUCN Red List Categories')
             plt.xlabel('IUCN Category')
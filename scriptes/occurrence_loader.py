@@ -0,0 +1,22 @@
+import pyarrow as pa
+import pyarrow.csv as pv
+
+def load_occurrences(file_path):
+    """Load a tab-separated GBIF occurrence file into a DataFrame with pyarrow"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        columns = file.readline().rstrip('\r\n').split('\t')
+
+    # Keep date-like columns as the text in the file, pyarrow would otherwise parse them
+    column_types = {col: pa.string() for col in columns
+                    if 'date' in col.lower() or col == 'modified' or col.startswith('last')}
+    column_types.update({'decimalLatitude': pa.float64(), 'decimalLongitude': pa.float64()})
+
+    table = pv.read_csv(file_path, parse_options=pv.ParseOptions(delimiter='\t'),
+                        convert_options=pv.ConvertOptions(column_types=column_types,
+                                                          strings_can_be_null=True))
+    # Empty columns come back as floats, the same as the default pandas reader
+    empty = {name for name, column in zip(table.column_names, table.columns)
+             if table.num_rows and column.null_count == table.num_rows}
+    table = table.cast(pa.schema([field.with_type(pa.float64()) if field.name in empty
+                                  else field for field in table.schema]))
+    return table.to_pandas()
@@ -1,107 +1,453 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+import csv
+import functools
+import io
 import math
+import mmap
+import multiprocessing
+import numpy as np
 import os
+from collections import deque
 from tqdm import tqdm
 
-def split_csv(input_file, num_splits=12):
-    try:
-        # First try to detect the file delimiter
-        print(f"Analyzing CSV file: {input_file}")
-        with open(input_file, 'r', encoding='utf-8') as file:
-            first_line = file.readline()
-            # Check common delimiters
+def _row_end_offsets(buffer, data_start, window=64 << 20):
+    """Return the byte offset just past every data row, found with a vectorized newline scan"""
+    row_ends = [np.flatnonzero(buffer[start:start + window] == 0x0A) + (start + 1)
+                for start in range(data_start, len(buffer), window)]
+    row_ends = np.concatenate(row_ends) if row_ends else np.empty(0, dtype=np.int64)
+    # A final row without a trailing newline ends at the end of the file
+    if len(buffer) > data_start and buffer[-1] != 0x0A:
+        row_ends = np.append(row_ends, len(buffer))
+    return row_ends
+
+def _copy_range(src, dst, start, end, block_size=1 << 20):
+    """Copy bytes [start, end) from src to dst, returning the number of bytes copied"""
+    dst.flush()
+    offset = start
+    # Let the kernel move the bytes directly between the two files where possible,
+    # copy_file_range can even share extents on filesystems that support it
+    for kernel_copy in ('copy_file_range', 'sendfile'):
+        if not hasattr(os, kernel_copy) or offset >= end:
+            continue
+        try:
+            while offset < end:
+                if kernel_copy == 'copy_file_range':
+                    sent = os.copy_file_range(src.fileno(), dst.fileno(), end - offset, offset)
+                else:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, end - offset)
+                if sent == 0:
+                    break  # Some filesystems copy nothing instead of failing
+                offset += sent
+        except OSError:
+            pass  # Not supported for these files, try the next way of copying the rest
+        if offset >= end:
+            return offset - start
+
+    # Positional reads leave the file offset alone, so a shared handle stays safe
+    while offset < end:
+        if hasattr(os, 'pread'):
+            block = os.pread(src.fileno(), min(block_size, end - offset), offset)
+        else:
+            src.seek(offset)
+            block = src.read(min(block_size, end - offset))
+        if not block:
+            break
+        dst.write(block)
+        offset += len(block)
+    return offset - start
+
+def _quotes_span_rows(buffer, window=8 << 20):
+    """Quote-parity prepass: a newline can only sit inside a quoted value if some line has an odd number of quotes"""
+    parity = 0
+    for start in range(0, len(buffer), window):
+        block = buffer[start:start + window]
+        # Running quote parity, which must be back to even at every newline
+        running = np.bitwise_xor.accumulate((block == 0x22).view(np.uint8)) ^ parity
+        if running[block == 0x0A].any():
+            return True
+        parity = int(running[-1])
+    return False
+
+def _sniff(input_file):
+    """Detect the delimiter and how quotes are treated, returning whether rows must be parsed"""
+    with open(input_file, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return ',', csv.QUOTE_MINIMAL, False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Check common delimiters, counting bytes skips the text decoding layer
+            header_end = mm.find(b'\n')
+            first_line = mm[:header_end if header_end != -1 else len(mm)]
             delimiters = [',', '\t', ';', '|']
-            counts = [first_line.count(d) for d in delimiters]
+            counts = [first_line.count(d.encode()) for d in delimiters]
             delimiter = delimiters[counts.index(max(counts))]
-        
-        print(f"Detected delimiter: '{delimiter}'")
-        
-        # Read the CSV file with the detected delimiter and additional parameters
-        df = pd.read_csv(input_file, 
-                        delimiter=delimiter,
-                        on_bad_lines='skip',  # Skip problematic lines
-                        low_memory=False,     # Avoid dtype warnings
-                        quoting=3)            # Disable quote parsing
-        
-        # Calculate the size of each split
-        total_rows = len(df)
-        rows_per_split = math.ceil(total_rows / num_splits)
-        
-        print(f"Total rows: {total_rows:,}")
-        print(f"Rows per split: {rows_per_split:,}")
-        
-        # Create output directory if it doesn't exist
-        output_dir = 'split_files'
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-        
-        # Split and save the files
-        print(f"Splitting file into {num_splits} parts...")
-        for i in tqdm(range(num_splits)):
-            start_idx = i * rows_per_split
-            end_idx = min((i + 1) * rows_per_split, total_rows)
-            
-            # Get the slice of dataframe
-            split_df = df.iloc[start_idx:end_idx]
-            
-            # Generate output filename
-            output_file = os.path.join(output_dir, f'part_{i+1}.csv')
-            
-            # Save to CSV
-            split_df.to_csv(output_file, index=False)
-        
-        print(f"\nSplit complete! Files saved in '{output_dir}' directory")
-        
-        # Print summary
-        print("\nSummary:")
-        print(f"Input file size: {os.path.getsize(input_file) / (1024*1024):.2f} MB")
-        print(f"Number of splits: {num_splits}")
-        print(f"Rows processed: {total_rows:,}")
+
+            # Darwin Core archives are tab-separated with no field enclosure (fieldsEnclosedBy=""),
+            # there a quote is just a character
+            if delimiter == '\t':
+                return delimiter, csv.QUOTE_NONE, False
+
+            # Quotes only matter for the split when a quoted value holds a newline
+            needs_parsing = False
+            if mm.find(b'"') != -1:
+                buffer = np.frombuffer(mm, dtype=np.uint8)
+                needs_parsing = _quotes_span_rows(buffer)
+                del buffer  # Release the view so the map can close
+    return delimiter, csv.QUOTE_MINIMAL, needs_parsing
+
+def _count_rows(input_file, window=64 << 20):
+    """Count data rows with a windowed newline scan, for the approaches that don't find rows themselves"""
+    with open(input_file, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Count lines the way file iteration does, a final line without a newline still counts
+            buffer = np.frombuffer(mm, dtype=np.uint8)
+            lines = sum(int(np.count_nonzero(buffer[start:start + window] == 0x0A))
+                        for start in range(0, len(buffer), window))
+            lines += int(buffer[-1] != 0x0A)
+            del buffer  # Release the view so the map can close
+    return max(lines - 1, 0)
+
+# Input file opened by the parent before forking, inherited by the workers
+_shared_input = None
+
+def _write_part(args):
+    """Write one part file: the header followed by a byte range of the input"""
+    input_file, header, start, end, output_file = args
+    with open(output_file, 'wb') as dst:
+        dst.write(header)
+        if _shared_input is not None:
+            return _copy_range(_shared_input, dst, start, end)
+        # Spawned workers don't inherit the handle, so open the file themselves
+        with open(input_file, 'rb') as src:
+            return _copy_range(src, dst, start, end)
+
+def _part_paths(output_dir, num_splits):
+    """Create the output directory and return the path of every part file"""
+    os.makedirs(output_dir, exist_ok=True)
+    return [os.path.join(output_dir, f'part_{i+1}.csv') for i in range(num_splits)]
+
+def _format_rows(rows, delimiter, lineterminator='\n', quoting=csv.QUOTE_MINIMAL):
+    """Format rows as CSV text, quoting only the fields that need it"""
+    text = io.StringIO()
+    # Without quoting, quote characters in values are written as they are
+    quotechar = None if quoting == csv.QUOTE_NONE else '"'
+    csv.writer(text, delimiter=delimiter, lineterminator=lineterminator,
+               quoting=quoting, quotechar=quotechar).writerows(rows)
+    return text.getvalue().encode('utf-8')
+
+@functools.lru_cache(maxsize=None)
+def _frame_writer(columns, dtypes, delimiter, quoting):
+    """Build a CSV writer specialized to one schema, so every split with that schema reuses it"""
+    header = _format_rows([columns], delimiter, quoting=quoting)
+
+    # Only integer schemas take the np.savetxt path, formatted from their own
+    # integer array so no value passes through float64
+    if all(pd.api.types.is_integer_dtype(dtype) for dtype in dtypes):
+        row_format = delimiter.join(['%d'] * len(dtypes))
+    else:
+        row_format = None
+    # Schemas without text go through pyarrow's multithreaded C++ writer, which
+    # prints floats in their shortest round-trip form and leaves gaps empty
+    use_arrow = not any(pd.api.types.is_object_dtype(dtype) for dtype in dtypes)
+    write_options = pv.WriteOptions(include_header=False, delimiter=delimiter)
+
+    def write(df, output_file):
+        with open(output_file, 'wb') as dst:
+            dst.write(header)
+            values = df.to_numpy() if row_format else None
+            # Mixed signed and unsigned columns would share a float64 array, so check the result
+            if values is not None and values.dtype.kind in 'iu':
+                np.savetxt(dst, np.ascontiguousarray(values), fmt=row_format)
+            elif use_arrow:
+                pv.write_csv(pa.Table.from_pandas(df, preserve_index=False), dst, write_options)
+            else:
+                # Text columns can mix types across chunks, the csv module writes any of them
+                rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+                dst.write(_format_rows(rows, delimiter, quoting=quoting))
+    return write
+
+def _write_frame(df, output_file, delimiter, quoting=csv.QUOTE_MINIMAL):
+    """Write a DataFrame as CSV without going through pandas' per-cell writer"""
+    _frame_writer(tuple(df.columns), tuple(df.dtypes), delimiter, quoting)(df, output_file)
+
+def _split_bytes(input_file, num_splits, output_dir='split_files'):
+    """Split on raw newlines, only safe when no quoted field can hide a newline"""
+    global _shared_input
+    with open(input_file, 'rb') as src, \
+            mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data_start = mm.find(b'\n') + 1 or len(mm)
+        header = mm[:data_start]
+        buffer = np.frombuffer(mm, dtype=np.uint8)
+        row_ends = _row_end_offsets(buffer, data_start)
+        del buffer  # Release the view so the map can close
+
+    # Calculate the size of each split, by bytes so wide rows don't make uneven parts
+    total_rows = len(row_ends)
+    data_end = int(row_ends[-1]) if total_rows else data_start
+    bytes_per_split = (data_end - data_start) / num_splits
+
+    print(f"Total rows: {total_rows:,}")
+    print(f"Bytes per split: {bytes_per_split / (1024*1024):,.2f} MB")
+
+    # Create output directory if it doesn't exist
+    paths = _part_paths(output_dir, num_splits)
+
+    # Byte offset where each part starts, plus the end of the file,
+    # each boundary moved to the row end nearest its equal-size target
+    offsets = np.full(num_splits + 1, data_start, dtype=np.int64)
+    if total_rows:
+        targets = data_start + bytes_per_split * np.arange(1, num_splits)
+        after = np.minimum(np.searchsorted(row_ends, targets), total_rows - 1)
+        before = np.maximum(after - 1, 0)
+        nearest = np.where(targets - row_ends[before] < row_ends[after] - targets,
+                           row_ends[before], row_ends[after])
+        offsets[1:-1] = nearest
+        offsets[-1] = data_end
+    offsets = offsets.tolist()
+
+    # Each part is an independent byte range, so write them in parallel
+    parts = [(input_file, header, offsets[i], offsets[i + 1], paths[i])
+             for i in range(num_splits)]
+
+    # Split and save the files
+    print(f"Splitting file into {num_splits} parts...")
+    with open(input_file, 'rb') as src:
+        # Forked workers share this one open file instead of each opening their own,
+        # other start methods (the default on macOS and Windows) reopen it by path
+        context = multiprocessing.get_context()
+        if context.get_start_method() == 'fork':
+            _shared_input = src
+        try:
+            with context.Pool(min(os.cpu_count() or 1, num_splits)) as pool:
+                for (_, _, start, end, output_file), copied in tqdm(
+                        zip(parts, pool.imap(_write_part, parts)), total=num_splits):
+                    if copied != end - start:
+                        raise OSError(f"Copied {copied:,} of {end - start:,} bytes into {output_file}")
+        finally:
+            _shared_input = None
+
+    print(f"\nSplit complete! Files saved in '{output_dir}' directory")
+
+    # Print summary
+    print("\nSummary:")
+    print(f"Input file size: {os.path.getsize(input_file) / (1024*1024):.2f} MB")
+    print(f"Number of splits: {num_splits}")
+    print(f"Rows processed: {total_rows:,}")
+
+def _parse_options(delimiter, quoting):
+    """pyarrow parse options, quoted values may contain delimiters and newlines unless quoting is off"""
+    if quoting == csv.QUOTE_NONE:
+        return pv.ParseOptions(delimiter=delimiter, quote_char=False,
+                               invalid_row_handler=lambda row: 'skip')
+    return pv.ParseOptions(delimiter=delimiter, newlines_in_values=True,
+                           invalid_row_handler=lambda row: 'skip')
+
+def _split_parsed(input_file, delimiter, num_splits, quoting=csv.QUOTE_MINIMAL, output_dir='split_files'):
+    """Stream the file through pyarrow's CSV reader, writing row slices as they are parsed"""
+    with open(input_file, 'rb') as file:
+        header = file.readline()
+
+    parse_options = _parse_options(delimiter, quoting)
+
+    # Read every column as text so values are written back unchanged
+    column_names = pv.read_csv(pa.py_buffer(header), parse_options=parse_options).column_names
+    def open_reader():
+        return pv.open_csv(
+            input_file,
+            read_options=pv.ReadOptions(block_size=64 << 20, use_threads=True),
+            parse_options=parse_options,
+            convert_options=pv.ConvertOptions(column_types={name: pa.string() for name in column_names}))
+
+    # Lines overcount rows when values span several, so count parsed rows
+    total_rows = sum(batch.num_rows for batch in open_reader())
+    rows_per_split = max(math.ceil(total_rows / num_splits), 1)
+    print(f"Total rows: {total_rows:,}")
+    print(f"Rows per split: {rows_per_split:,}")
+
+    paths = _part_paths(output_dir, num_splits)
+
+    # Only one parsed batch is held at a time, slices of it go straight to disk
+    lineterminator = '\r\n' if header.endswith(b'\r\n') else '\n'
+    part, part_rows = 0, 0
+    dst = open(paths[0], 'wb')
+    try:
+        dst.write(header)
+        for batch in tqdm(open_reader()):
+            while batch.num_rows > 0:
+                # The last part takes whatever is left
+                if part < num_splits - 1:
+                    take = min(rows_per_split - part_rows, batch.num_rows)
+                else:
+                    take = batch.num_rows
+                rows = zip(*(column.to_pylist() for column in batch.slice(0, take).columns))
+                dst.write(_format_rows(rows, delimiter, lineterminator, quoting))
+                batch = batch.slice(take)
+                part_rows += take
+
+                if part_rows == rows_per_split and part < num_splits - 1:
+                    dst.close()
+                    part, part_rows = part + 1, 0
+                    dst = open(paths[part], 'wb')
+                    dst.write(header)
+    finally:
+        dst.close()
+
+    # Parts past the end of the data only get the header
+    for i in range(part + 1, num_splits):
+        with open(paths[i], 'wb') as dst:
+            dst.write(header)
+
+    print(f"\nSplit complete using parsed processing! Files saved in '{output_dir}' directory")
+
+def _split_parquet(input_file, delimiter, num_splits, quoting=csv.QUOTE_MINIMAL, output_dir='split_files'):
+    """Write one Parquet file holding a row group per split instead of separate CSV parts"""
+    parse_options = _parse_options(delimiter, quoting)
+    def open_reader():
+        return pv.open_csv(input_file,
+                           read_options=pv.ReadOptions(block_size=64 << 20, use_threads=True),
+                           parse_options=parse_options)
+
+    try:
+        # Counting the rows also checks every block still fits the types inferred from the first
+        total_rows = sum(batch.num_rows for batch in open_reader())
+        reader = open_reader()
+        schema = reader.schema
+        batches = reader
+    except pa.ArrowInvalid:
+        # Types change further into the file, infer them from all of it instead
+        table = pv.read_csv(input_file, parse_options=parse_options)
+        total_rows, schema = table.num_rows, table.schema
+        batches = table.to_batches()
+        del table
+
+    rows_per_split = max(math.ceil(total_rows / num_splits), 1)
+    print(f"Total rows: {total_rows:,}")
+    print(f"Rows per split: {rows_per_split:,}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, 'dataset.parquet')
+
+    # Read a single split back with pq.ParquetFile(output_file).read_row_group(i)
+    with pq.ParquetWriter(output_file, schema, compression='zstd') as writer:
+        # At most one split's worth of rows is held before it is written and released
+        pending, pending_rows = [], 0
+        for batch in tqdm(batches):
+            while batch.num_rows > 0:
+                take = min(rows_per_split - pending_rows, batch.num_rows)
+                pending.append(batch.slice(0, take))
+                batch = batch.slice(take)
+                pending_rows += take
+
+                if pending_rows == rows_per_split:
+                    writer.write_table(pa.Table.from_batches(pending, schema),
+                                       row_group_size=rows_per_split)
+                    pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=rows_per_split)
+
+    print(f"\nSplit complete! Row groups saved in '{output_file}'")
+
+def split_csv(input_file, num_splits=12, output_format='csv'):
+    # First detect the file delimiter, every approach below relies on it
+    print(f"Analyzing CSV file: {input_file}")
+    try:
+        delimiter, quoting, needs_parsing = _sniff(input_file)
+    except Exception as e:
+        print(f"Could not read the file: {str(e)}")
+        return
+
+    print(f"Detected delimiter: '{delimiter}'")
+
+    if output_format == 'parquet':
+        try:
+            _split_parquet(input_file, delimiter, num_splits, quoting)
+            return
+        except Exception as e:
+            print(f"Parquet output failed: {str(e)}")
+            print("\nWriting CSV parts instead...")
+
+    try:
+        # Split as raw bytes unless quoted values carry newlines across lines
+        if not needs_parsing:
+            _split_bytes(input_file, num_splits)
+            return
+        print("Quoted fields span lines, parsing rows to keep them intact...")
         
     except Exception as e:
         print(f"An error occurred: {str(e)}")
         print("\nTrying alternative approach...")
-        try:
-            # Alternative approach using chunk reading
-            chunk_size = 10000  # Adjust this value based on your memory constraints
-            total_rows = sum(1 for _ in open(input_file, 'r', encoding='utf-8')) - 1
-            rows_per_split = math.ceil(total_rows / num_splits)
-            
-            print(f"Processing file in chunks...")
-            current_split = 0
-            current_row = 0
-            output_df = pd.DataFrame()
-            
-            for chunk in tqdm(pd.read_csv(input_file, 
+
+    try:
+        _split_parsed(input_file, delimiter, num_splits, quoting)
+        return
+    except Exception as e:
+        print(f"Parsed approach failed: {str(e)}")
+        print("\nTrying chunk processing...")
+
+    try:
+        # Alternative approach using chunk reading
+        chunk_size = 1_000_000  # Adjust this value based on your memory constraints
+        total_rows = _count_rows(input_file)
+        rows_per_split = max(math.ceil(total_rows / num_splits), 1)
+        
+        print(f"Processing file in chunks...")
+        paths = _part_paths('split_files', num_splits)
+        current_split = 0
+        current_row = 0
+        # Queue chunks and only concatenate the rows a full split needs
+        pending = deque()
+        pending_rows = 0
+        
+        # Read raw bytes through a large buffer, the C parser decodes them itself
+        with open(input_file, 'rb', buffering=8 << 20) as file:
+            for chunk in tqdm(pd.read_csv(file,
                                         delimiter=delimiter,
                                         chunksize=chunk_size,
+                                        engine='c',
+                                        quoting=quoting,
                                         on_bad_lines='skip',
-                                        low_memory=False,
-                                        quoting=3)):
-                output_df = pd.concat([output_df, chunk])
+                                        low_memory=False)):
+                pending.append(chunk)
+                pending_rows += len(chunk)
                 current_row += len(chunk)
-                
-                while len(output_df) >= rows_per_split and current_split < num_splits - 1:
+            
+                while pending_rows >= rows_per_split and current_split < num_splits - 1:
+                    # Take whole chunks off the front, cutting only the last one
+                    split_chunks = []
+                    needed = rows_per_split
+                    while needed > 0:
+                        head = pending.popleft()
+                        if len(head) > needed:
+                            # The rest of this chunk starts the next split
+                            pending.appendleft(head.iloc[needed:])
+                            head = head.iloc[:needed]
+                        split_chunks.append(head)
+                        needed -= len(head)
+
                     # Save current split
-                    split_df = output_df.iloc[:rows_per_split]
-                    output_file = os.path.join('split_files', f'part_{current_split + 1}.csv')
-                    split_df.to_csv(output_file, index=False)
-                    
+                    _write_frame(pd.concat(split_chunks, ignore_index=True), paths[current_split],
+                                 delimiter, quoting)
+                    del split_chunks
+                
                     # Prepare for next split
-                    output_df = output_df.iloc[rows_per_split:]
+                    pending_rows -= rows_per_split
                     current_split += 1
-            
-            # Save the last split
-            if not output_df.empty and current_split < num_splits:
-                output_file = os.path.join('split_files', f'part_{current_split + 1}.csv')
-                output_df.to_csv(output_file, index=False)
-            
-            print(f"\nSplit complete using chunk processing! Files saved in 'split_files' directory")
-            
-        except Exception as e:
-            print(f"Alternative approach also failed: {str(e)}")
-            print("\nPlease check if the file is properly formatted or try opening it in a text editor to inspect its structure.")
+        
+        # Save the last split
+        if pending_rows > 0 and current_split < num_splits:
+            _write_frame(pd.concat(pending, ignore_index=True), paths[current_split],
+                         delimiter, quoting)
+        
+        print(f"\nSplit complete using chunk processing! Files saved in 'split_files' directory")
+        
+    except Exception as e:
+        print(f"Alternative approach also failed: {str(e)}")
+        print("\nPlease check if the file is properly formatted or try opening it in a text editor to inspect its structure.")
 
 if __name__ == "__main__":
     input_file = "dataset.csv"  # Replace with your file path
-    split_csv(input_file)
\ No newline at end of file
+    split_csv(input_file)